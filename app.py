@@ -1,26 +1,88 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, Response
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import orjson
 import json
 import os
 
 app = Flask(__name__)
 
+# Serialize numpy scalars/arrays natively when building JSON responses
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
 class IPLData:
     def __init__(self):
         self.seasonal_trends = None
         self.batting_stats = None
+        self.seasonal_trends_table = None
+        self.batting_stats_table = None
+        self._trends_json = None
+        self._trends_arrow = None
+        self._top_players_json = None
+        self._era_json = None
         self.load_data()
     
+    def _read_processed(self, name):
+        """Read a processed table as an Arrow table, preferring Parquet over CSV"""
+        parquet_path = f'data/processed/{name}.parquet'
+        if os.path.exists(parquet_path):
+            return pq.read_table(parquet_path)
+        return pacsv.read_csv(f'data/processed/{name}.csv')
+    
     def load_data(self):
         """Load the analysis results"""
         try:
-            self.seasonal_trends = pd.read_csv('data/processed/seasonal_trends.csv')
-            self.batting_stats = pd.read_csv('data/processed/batting_stats.csv')
+            self.seasonal_trends_table = self._read_processed('seasonal_trends')
+            self.batting_stats_table = self._read_processed('batting_stats')
+            # Arrow-backed DataFrames share the tables' buffers
+            self.seasonal_trends = self.seasonal_trends_table.to_pandas(types_mapper=pd.ArrowDtype)
+            self.batting_stats = self.batting_stats_table.to_pandas(types_mapper=pd.ArrowDtype)
+            self._build_payloads()
             print("✅ Data loaded successfully for web app!")
             return True
         except Exception as e:
             print(f"❌ Error loading data: {e}")
             return False
+    
+    def _build_payloads(self):
+        """Pre-serialize the API responses once, since the data never changes after load"""
+        # Seasonal trends (orjson writes NaN values as null)
+        trends_json = self.seasonal_trends.to_dict('records')
+        if trends_json:
+            print("📊 First trend record:", {k: v for k, v in trends_json[0].items() if pd.notnull(v)})
+        self._trends_json = orjson.dumps(trends_json, option=ORJSON_OPTIONS)
+        
+        # Seasonal trends as an Arrow IPC stream for Arrow-aware clients
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, self.seasonal_trends_table.schema) as writer:
+            writer.write_table(self.seasonal_trends_table)
+        self._trends_arrow = sink.getvalue().to_pybytes()
+        
+        # Top 10 players by strike rate (min 100 balls)
+        top_players = self.batting_stats[self.batting_stats['balls_faced'] >= 100]\
+            .nlargest(10, 'strike_rate')[['batter', 'strike_rate', 'year', 'balls_faced']]\
+            .to_dict('records')
+        self._top_players_json = orjson.dumps(top_players, option=ORJSON_OPTIONS)
+        
+        # Era comparison
+        era1 = self.seasonal_trends[self.seasonal_trends['year'].between(2008, 2013)]
+        era2 = self.seasonal_trends[self.seasonal_trends['year'].between(2014, 2024)]
+        
+        era_comparison = {
+            'era1': {
+                'name': '2008-2013',
+                'avg_strike_rate': float(era1['strike_rate'].mean()) if not era1.empty else 0,
+                'avg_boundary_pct': float(era1['boundary_percentage'].mean()) if not era1.empty else 0
+            },
+            'era2': {
+                'name': '2014-2024', 
+                'avg_strike_rate': float(era2['strike_rate'].mean()) if not era2.empty else 0,
+                'avg_boundary_pct': float(era2['boundary_percentage'].mean()) if not era2.empty else 0
+            }
+        }
+        self._era_json = orjson.dumps(era_comparison, option=ORJSON_OPTIONS)
 
 # Initialize data
 ipl_data = IPLData()
@@ -32,51 +94,30 @@ def index():
 
 @app.route('/api/trends')
 def get_trends():
-    """API endpoint for seasonal trends - FIXED VERSION"""
-    if ipl_data.seasonal_trends is not None:
-        # Convert to list of dictionaries and handle NaN values
-        trends_data = ipl_data.seasonal_trends.where(pd.notnull(ipl_data.seasonal_trends), None)
-        trends_json = trends_data.to_dict('records')
-        
-        # Debug: Print first record to see what data is available
-        if trends_json:
-            print("📊 First trend record:", {k: v for k, v in trends_json[0].items() if v is not None})
-        
-        return jsonify(trends_json)
+    """API endpoint for seasonal trends"""
+    if ipl_data._trends_json is not None:
+        return Response(ipl_data._trends_json, mimetype='application/json')
     return jsonify([])
 
+@app.route('/api/trends_arrow')
+def get_trends_arrow():
+    """API endpoint for seasonal trends as an Arrow IPC stream"""
+    if ipl_data._trends_arrow is not None:
+        return Response(ipl_data._trends_arrow, mimetype='application/vnd.apache.arrow.stream')
+    return Response(status=404)
+
 @app.route('/api/top_players')
 def get_top_players():
     """API endpoint for top players"""
-    if ipl_data.batting_stats is not None:
-        # Get top 10 players by strike rate (min 100 balls)
-        top_players = ipl_data.batting_stats[ipl_data.batting_stats['balls_faced'] >= 100]\
-            .nlargest(10, 'strike_rate')[['batter', 'strike_rate', 'year', 'balls_faced']]\
-            .to_dict('records')
-        return jsonify(top_players)
+    if ipl_data._top_players_json is not None:
+        return Response(ipl_data._top_players_json, mimetype='application/json')
     return jsonify([])
 
 @app.route('/api/era_comparison')
 def get_era_comparison():
     """API endpoint for era comparison"""
-    if ipl_data.seasonal_trends is not None:
-        # Calculate era comparison
-        era1 = ipl_data.seasonal_trends[ipl_data.seasonal_trends['year'].between(2008, 2013)]
-        era2 = ipl_data.seasonal_trends[ipl_data.seasonal_trends['year'].between(2014, 2024)]
-        
-        era_comparison = {
-            'era1': {
-                'name': '2008-2013',
-                'avg_strike_rate': float(era1['strike_rate'].mean()) if not era1.empty else 0,
-                'avg_boundary_pct': float(era1['boundary_percentage'].mean()) if not era1.empty else 0
-            },
-            'era2': {
-                'name': '2014-2024', 
-                'avg_strike_rate': float(era2['strike_rate'].mean()) if not era2.empty else 0,
-                'avg_boundary_pct': float(era2['boundary_percentage'].mean()) if not era2.empty else 0
-            }
-        }
-        return jsonify(era_comparison)
+    if ipl_data._era_json is not None:
+        return Response(ipl_data._era_json, mimetype='application/json')
     return jsonify({})
 
 @app.route('/dashboard')
@@ -98,7 +139,7 @@ def debug_data():
             'years': ipl_data.seasonal_trends['year'].tolist(),
             'sample_data': ipl_data.seasonal_trends.head(3).to_dict('records')
         }
-        return jsonify(debug_info)
+        return Response(orjson.dumps(debug_info, option=ORJSON_OPTIONS), mimetype='application/json')
     return jsonify({'error': 'No data loaded'})
 
 if __name__ == '__main__':
@@ -108,5 +149,6 @@ if __name__ == '__main__':
     print("   - http://localhost:5000/dashboard (Interactive Charts)")
     print("   - http://localhost:5000/players (Top Players)")
     print("   - http://localhost:5000/api/trends (Data API)")
+    print("   - http://localhost:5000/api/trends_arrow (Data API, Arrow IPC)")
     print("   - http://localhost:5000/api/debug (Debug Info)")
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -1,24 +1,83 @@
 import pandas as pd
 import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from numba import njit
 from scipy import stats
+import math
 import os
 
+# Columns of the cleaned data that the analysis reads
+LOAD_COLS = [
+    'year', 'batter', 'batsman_runs', 'total_runs', 'extras_type',
+    'is_wicket', 'is_boundary', 'is_dot_ball', 'is_six', 'is_four'
+]
+
+
+@njit(cache=True)
+def independent_t_stat(a, b):
+    """Two-sample t statistic and degrees of freedom (pooled variance, as scipy's ttest_ind)"""
+    n1 = a.size
+    n2 = b.size
+    v1 = a.var() * n1 / (n1 - 1)
+    v2 = b.var() * n2 / (n2 - 1)
+    dof = n1 + n2 - 2
+    pooled_var = ((n1 - 1) * v1 + (n2 - 1) * v2) / dof
+    se = math.sqrt(pooled_var * (1.0 / n1 + 1.0 / n2))
+    diff = a.mean() - b.mean()
+    # Zero variance in both samples: nan for equal means, otherwise +/-inf (as scipy returns)
+    if se == 0.0:
+        t_stat = math.nan if diff == 0.0 else math.copysign(math.inf, diff)
+    else:
+        t_stat = diff / se
+    return t_stat, dof
+
 class IPLAnalyzer:
     def __init__(self):
         self.data = None
+        # Memoized results for repeated calls in the same session (e.g. notebooks)
+        self._batting_stats_cache = {}
+        self._era_cache = {}
         self.load_data()
     
     def load_data(self):
         """Load the cleaned data with proper error handling"""
         try:
-            # Load with low_memory=False to handle mixed types
-            self.data = pd.read_csv('data/processed/cleaned_data.csv', low_memory=False)
+            # Prefer the typed Parquet file; fall back to CSV if the pipeline hasn't written it yet
+            if os.path.exists('data/processed/cleaned_data.parquet'):
+                self.data = pd.read_parquet('data/processed/cleaned_data.parquet', engine='pyarrow',
+                                            columns=LOAD_COLS, dtype_backend='pyarrow')
+            else:
+                # Multithreaded Arrow CSV parser
+                self.data = pacsv.read_csv(
+                    'data/processed/cleaned_data.csv',
+                    read_options=pacsv.ReadOptions(use_threads=True),
+                    convert_options=pacsv.ConvertOptions(include_columns=LOAD_COLS)
+                ).to_pandas()
             print("✅ Cleaned data loaded successfully!")
             print(f"📊 Data shape: {self.data.shape}")
             
             # Ensure year column is integer
             self.data['year'] = pd.to_numeric(self.data['year'], errors='coerce')
             
+            # Keep rows ordered by year so year ranges are contiguous slices
+            self.data = self.data.sort_values('year', kind='stable', ignore_index=True)
+            
+            # Use categoricals for repeated strings so groupbys hash int codes
+            for col in ['batter', 'extras_type']:
+                self.data[col] = self.data[col].astype('category')
+            
+            # Downcast small counts to the narrowest unsigned type
+            for col in ['batsman_runs', 'total_runs']:
+                if col in self.data:
+                    self.data[col] = pd.to_numeric(self.data[col], downcast='unsigned')
+            
+            # 0/1 flags as int8 (older cleaned files stored them as True/False)
+            for col in ['is_wicket', 'is_boundary', 'is_dot_ball', 'is_six', 'is_four']:
+                if col in self.data:
+                    self.data[col] = self.data[col].astype(np.int8)
+            
         except Exception as e:
             print(f"❌ Error loading data: {e}")
     
@@ -26,23 +85,32 @@ class IPLAnalyzer:
         """Calculate comprehensive batting statistics"""
         print("📈 Calculating batting statistics...")
         
-        # Filter out rows where batter is missing
-        valid_data = self.data[self.data['batter'].notna()]
-        
-        # Player-level stats by season
-        batting_stats = valid_data.groupby(['year', 'batter']).agg({
-            'batsman_runs': ['sum', 'count'],
-            'is_boundary': 'sum',
-            'is_dot_ball': 'sum',
-            'is_wicket': 'sum',
-            'is_six': 'sum',
-            'is_four': 'sum'
-        }).reset_index()
+        # Cheap fingerprint of the loaded data; a reload or change gives a new key
+        cache_key = (self.data.shape, self.data['year'].sum())
+        if cache_key in self._batting_stats_cache:
+            print("✅ Batting stats loaded from cache")
+            return self._batting_stats_cache[cache_key].copy()
         
-        batting_stats.columns = [
-            'year', 'batter', 'runs_scored', 'balls_faced', 
-            'boundaries', 'dot_balls', 'wickets', 'sixes', 'fours'
-        ]
+        # Player-level stats by season, run as a single lazy Polars plan
+        # (filter out rows where batter is missing, then group and aggregate)
+        stat_cols = ['year', 'batter', 'batsman_runs', 'total_runs', 'is_boundary', 'is_dot_ball', 'is_wicket', 'is_six', 'is_four']
+        batting_stats = pl.from_pandas(self.data[stat_cols]).lazy()\
+            .filter(pl.col('batter').is_not_null() & pl.col('year').is_not_null())\
+            .group_by(['year', 'batter'])\
+            .agg([
+                pl.col('batsman_runs').sum().alias('runs_scored'),
+                pl.col('batsman_runs').count().alias('balls_faced'),
+                pl.col('is_boundary').sum().alias('boundaries'),
+                pl.col('is_dot_ball').sum().alias('dot_balls'),
+                pl.col('is_wicket').sum().alias('wickets'),
+                pl.col('is_six').sum().alias('sixes'),
+                pl.col('is_four').sum().alias('fours'),
+                # Runs including extras, so seasonal run rate can be derived without rescanning the ball data
+                pl.col('total_runs').sum().alias('total_runs')
+            ])\
+            .sort(['year', pl.col('batter').cast(pl.String)])\
+            .collect()\
+            .to_pandas()
         
         # Calculate metrics
         batting_stats['strike_rate'] = (batting_stats['runs_scored'] / batting_stats['balls_faced']) * 100
@@ -52,11 +120,15 @@ class IPLAnalyzer:
         batting_stats['four_percentage'] = (batting_stats['fours'] / batting_stats['balls_faced']) * 100
         
         # Handle average (avoid division by zero)
-        batting_stats['average'] = batting_stats.apply(
-            lambda x: x['runs_scored'] / x['wickets'] if x['wickets'] > 0 else np.nan, 
-            axis=1
+        runs = batting_stats['runs_scored'].to_numpy(dtype=float)
+        wickets = batting_stats['wickets'].to_numpy(dtype=float)
+        batting_stats['average'] = np.divide(
+            runs, wickets,
+            out=np.full_like(runs, np.nan),
+            where=wickets > 0
         )
         
+        self._batting_stats_cache[cache_key] = batting_stats.copy()
         print(f"✅ Batting stats calculated for {len(batting_stats)} player-seasons")
         return batting_stats
     
@@ -64,25 +136,31 @@ class IPLAnalyzer:
         """Calculate seasonal trends"""
         print("📊 Calculating seasonal trends...")
         
-        seasonal_trends = batting_stats.groupby('year').agg({
-            'strike_rate': 'mean',
-            'boundary_percentage': 'mean',
-            'dot_ball_percentage': 'mean',
-            'six_percentage': 'mean',
-            'four_percentage': 'mean',
-            'runs_scored': 'mean',
-            'balls_faced': 'mean'
-        }).reset_index()
-        
-        # Calculate overall run rate (runs per over)
-        seasonal_runs = self.data.groupby('year').agg({
-            'total_runs': 'sum',
-            'over': 'count'
-        }).reset_index()
-        seasonal_runs['run_rate'] = (seasonal_runs['total_runs'] / seasonal_runs['over']) * 6
-        
-        # Merge run rate with other trends
-        seasonal_trends = pd.merge(seasonal_trends, seasonal_runs[['year', 'run_rate']], on='year')
+        mean_cols = ['strike_rate', 'boundary_percentage', 'dot_ball_percentage', 'six_percentage',
+                     'four_percentage', 'runs_scored', 'balls_faced']
+        
+        # np.add.reduceat needs at least one row
+        if len(batting_stats) == 0:
+            print("✅ Seasonal trends calculated")
+            return pd.DataFrame(columns=['year'] + mean_cols + ['run_rate'])
+        
+        # Sorted by year, each season is a contiguous run of rows that can be reduced with np.add.reduceat
+        df = batting_stats.sort_values('year', kind='stable')
+        years = df['year'].to_numpy()
+        offsets = np.concatenate(([0], np.flatnonzero(np.diff(years)) + 1))
+        counts = np.diff(np.append(offsets, len(df)))
+        
+        # Reduce all columns at once over a single (rows, columns) matrix
+        matrix = df[mean_cols + ['total_runs']].to_numpy(dtype=np.float64)
+        sums = np.add.reduceat(matrix, offsets, axis=0)
+        
+        seasonal_trends = pd.DataFrame(sums[:, :len(mean_cols)] / counts[:, None], columns=mean_cols)
+        seasonal_trends.insert(0, 'year', years[offsets])
+        
+        # Calculate overall run rate (runs per over) from the same per-season sums
+        season_runs = sums[:, len(mean_cols)]
+        season_balls = sums[:, mean_cols.index('balls_faced')]
+        seasonal_trends['run_rate'] = (season_runs / season_balls) * 6
         
         print("✅ Seasonal trends calculated")
         return seasonal_trends
@@ -91,40 +169,44 @@ class IPLAnalyzer:
         """Compare two eras using statistical tests - FIXED VERSION"""
         print(f"🔬 Comparing eras: {era1} vs {era2}")
         
-        era1_data = self.data[(self.data['year'] >= era1[0]) & (self.data['year'] <= era1[1])]
-        era2_data = self.data[(self.data['year'] >= era2[0]) & (self.data['year'] <= era2[1])]
-        
-        # FIXED: Calculate strike rates properly without deprecated method
-        def calculate_player_sr(player_data):
-            if len(player_data) == 0:
-                return np.nan
-            runs = player_data['batsman_runs'].sum()
-            balls = len(player_data)
-            return (runs / balls) * 100 if balls > 0 else np.nan
-        
-        # Calculate strike rates for each batter in each era
-        era1_player_stats = era1_data.groupby('batter').apply(
-            lambda x: pd.Series({
-                'strike_rate': calculate_player_sr(x),
-                'balls_faced': len(x)
-            })
-        ).reset_index()
-        
-        era2_player_stats = era2_data.groupby('batter').apply(
-            lambda x: pd.Series({
-                'strike_rate': calculate_player_sr(x),
-                'balls_faced': len(x)
-            })
-        ).reset_index()
+        cache_key = (tuple(era1), tuple(era2), id(self.data))
+        if cache_key in self._era_cache:
+            print("✅ Era comparison loaded from cache")
+            return dict(self._era_cache[cache_key])
+        
+        # load_data sorts the data by year, so each era is a contiguous slice found by binary search.
+        # If self.data was replaced or filtered out of order, fall back to a boolean mask.
+        years = self.data['year'].to_numpy(dtype=float, na_value=np.nan)
+        years_sorted = self.data['year'].is_monotonic_increasing
+        
+        def era_slice(era):
+            if not years_sorted:
+                return self.data[(years >= era[0]) & (years <= era[1])]
+            start = np.searchsorted(years, era[0], side='left')
+            end = np.searchsorted(years, era[1], side='right')
+            return self.data.iloc[start:end]
         
+        era1_data = era_slice(era1)
+        era2_data = era_slice(era2)
+        
+        # Calculate strike rates for each batter with a single groupby-agg pass
+        def calculate_player_sr(era_data):
+            player_stats = era_data.groupby('batter', observed=True)['batsman_runs'].agg(runs='sum', balls_faced='count')
+            player_stats['strike_rate'] = (player_stats['runs'] / player_stats['balls_faced']) * 100
+            return player_stats
+
+        era1_player_stats = calculate_player_sr(era1_data)
+        era2_player_stats = calculate_player_sr(era2_data)
+
         # Filter players with minimum balls faced (e.g., at least 30 balls)
         min_balls = 30
-        era1_sr = era1_player_stats[era1_player_stats['balls_faced'] >= min_balls]['strike_rate'].dropna()
-        era2_sr = era2_player_stats[era2_player_stats['balls_faced'] >= min_balls]['strike_rate'].dropna()
+        era1_sr = era1_player_stats.loc[era1_player_stats['balls_faced'] >= min_balls, 'strike_rate'].dropna()
+        era2_sr = era2_player_stats.loc[era2_player_stats['balls_faced'] >= min_balls, 'strike_rate'].dropna()
         
         # Perform t-test only if we have enough data
         if len(era1_sr) > 1 and len(era2_sr) > 1:
-            t_stat, p_value = stats.ttest_ind(era1_sr, era2_sr)
+            t_stat, dof = independent_t_stat(era1_sr.to_numpy(dtype=np.float64), era2_sr.to_numpy(dtype=np.float64))
+            p_value = 2 * stats.t.sf(abs(t_stat), dof)
         else:
             t_stat, p_value = np.nan, np.nan
         
@@ -148,6 +230,7 @@ class IPLAnalyzer:
             'players_era2': len(era2_sr)
         }
         
+        self._era_cache[cache_key] = dict(result)
         print("✅ Era comparison completed")
         return result
     
@@ -158,11 +241,27 @@ class IPLAnalyzer:
         # Filter players with significant balls faced (at least 100 balls per season)
         significant_players = batting_stats[batting_stats['balls_faced'] >= 100]
         
+        # Find the k-th largest value by partitioning, then order only the rows at or above it.
+        # Ties keep the earliest rows, matching nlargest(keep='first').
+        def top_k(column, k=10):
+            values = significant_players[column].to_numpy(dtype=float, na_value=np.nan)
+            is_nan = np.isnan(values)
+            valid = np.flatnonzero(~is_nan)
+            k_valid = min(k, len(valid))
+            idx = valid[:0]
+            if k_valid > 0:
+                kth_value = np.partition(values[valid], -k_valid)[-k_valid]
+                candidates = valid[values[valid] >= kth_value]
+                idx = candidates[np.lexsort((candidates, -values[candidates]))][:k_valid]
+            # Like nlargest, pad with NaN rows (in order) when there are fewer than k values
+            idx = np.concatenate((idx, np.flatnonzero(is_nan)[:k - len(idx)]))
+            return significant_players.iloc[idx]
+        
         # Top 10 batsmen by strike rate (min 100 balls)
-        top_strike_rate = significant_players.nlargest(10, 'strike_rate')[['year', 'batter', 'strike_rate', 'balls_faced']]
+        top_strike_rate = top_k('strike_rate')[['year', 'batter', 'strike_rate', 'balls_faced']]
         
         # Top 10 boundary hitters
-        top_boundary = significant_players.nlargest(10, 'boundary_percentage')[['year', 'batter', 'boundary_percentage', 'balls_faced']]
+        top_boundary = top_k('boundary_percentage')[['year', 'batter', 'boundary_percentage', 'balls_faced']]
         
         return {
             'top_strike_rate': top_strike_rate,
@@ -187,6 +286,9 @@ def run_complete_analysis():
     # 2. Get seasonal trends
     seasonal_trends = analyzer.get_seasonal_trends(batting_stats)
     
+    # total_runs (includes extras) is only needed for the run rate; keep the saved batting table batter-only
+    batting_stats = batting_stats.drop(columns=['total_runs'])
+    
     # 3. Era comparison
     era_compare = analyzer.era_comparison()
     
@@ -230,12 +332,14 @@ def run_complete_analysis():
     
     # Save results
     os.makedirs('data/processed', exist_ok=True)
-    seasonal_trends.to_csv('data/processed/seasonal_trends.csv', index=False)
-    batting_stats.to_csv('data/processed/batting_stats.csv', index=False)
+    seasonal_trends.to_parquet('data/processed/seasonal_trends.parquet', engine='pyarrow', compression='zstd', index=False)
+    batting_stats.to_parquet('data/processed/batting_stats.parquet', engine='pyarrow', compression='zstd', index=False)
+    pacsv.write_csv(pa.Table.from_pandas(seasonal_trends, preserve_index=False), 'data/processed/seasonal_trends.csv')
+    pacsv.write_csv(pa.Table.from_pandas(batting_stats, preserve_index=False), 'data/processed/batting_stats.csv')
     
     print(f"\n💾 Results saved to:")
-    print(f"   - data/processed/seasonal_trends.csv")
-    print(f"   - data/processed/batting_stats.csv")
+    print(f"   - data/processed/seasonal_trends.parquet (+ .csv)")
+    print(f"   - data/processed/batting_stats.parquet (+ .csv)")
     
     print(f"\n🎉 ANALYSIS COMPLETED SUCCESSFULLY!")
     
@@ -1,7 +1,32 @@
 import pandas as pd
 import numpy as np
+from numba import njit, prange
 import os
 
+# Columns persisted to the cleaned data files (everything the analysis reads)
+KEEP_COLS = [
+    'year', 'match_id', 'batter', 'bowler', 'over', 'ball',
+    'batsman_runs', 'total_runs', 'extras_type', 'is_wicket',
+    'is_boundary', 'is_dot_ball', 'is_six', 'is_four'
+]
+
+
+@njit(parallel=True, cache=True)
+def compute_ball_flags(batsman_runs, total_runs, extras_none):
+    """Derive boundary/dot/six/four flags (0/1 as int8) in a single pass over the ball data"""
+    n = batsman_runs.size
+    is_boundary = np.empty(n, np.int8)
+    is_dot_ball = np.empty(n, np.int8)
+    is_six = np.empty(n, np.int8)
+    is_four = np.empty(n, np.int8)
+    for i in prange(n):
+        runs = batsman_runs[i]
+        is_four[i] = 1 if runs == 4 else 0
+        is_six[i] = 1 if runs == 6 else 0
+        is_boundary[i] = is_four[i] | is_six[i]
+        is_dot_ball[i] = 1 if total_runs[i] == 0 and extras_none[i] else 0
+    return is_boundary, is_dot_ball, is_six, is_four
+
 class DataProcessor:
     def __init__(self):
         self.ball_df = None
@@ -46,22 +71,15 @@ class DataProcessor:
         }, inplace=True)
         
         # Convert data types
-        self.ball_df['is_wicket'] = self.ball_df['is_wicket'].astype(int)
+        self.ball_df['is_wicket'] = self.ball_df['is_wicket'].astype(np.int8)
         
         # Clean match data - handle date conversion
         self.match_df['date'] = pd.to_datetime(self.match_df['date'])
         
         # Extract year from season - handle different season formats
-        # Some might be '2008', others '2007/08'
-        def extract_year(season):
-            if isinstance(season, str):
-                # Extract first 4 digits if it's like '2007/08'
-                numbers = ''.join(filter(str.isdigit, season))
-                if len(numbers) >= 4:
-                    return int(numbers[:4])
-            return None
-        
-        self.match_df['year'] = self.match_df['season'].apply(extract_year)
+        # Some might be '2008', others '2007/08' (take the first 4 digits)
+        self.match_df['year'] = self.match_df['season'].astype(str)\
+            .str.extract(r'(\d{4})', expand=False).astype('Int64')
         
         print("✅ Data cleaning completed!")
     
@@ -69,19 +87,23 @@ class DataProcessor:
         """Merge ball and match data"""
         print("🔗 Merging datasets...")
         
-        self.merged_df = pd.merge(
-            self.ball_df, 
-            self.match_df, 
-            left_on='match_id', 
-            right_on='id', 
-            how='left'
+        # Only a few match columns are needed, so look them up per ball instead of a wide join
+        match_lookup = self.match_df.set_index('id')
+        self.merged_df = self.ball_df.copy()
+        for col in ['year', 'season', 'team1', 'team2']:
+            self.merged_df[col] = self.merged_df['match_id'].map(match_lookup[col])
+        
+        # Create additional useful columns (fused into one Numba pass)
+        extras_none = (self.merged_df['extras_type'] == 'none').to_numpy()
+        is_boundary, is_dot_ball, is_six, is_four = compute_ball_flags(
+            self.merged_df['batsman_runs'].to_numpy(),
+            self.merged_df['total_runs'].to_numpy(),
+            extras_none
         )
-        
-        # Create additional useful columns
-        self.merged_df['is_boundary'] = self.merged_df['batsman_runs'].isin([4, 6])
-        self.merged_df['is_dot_ball'] = (self.merged_df['total_runs'] == 0) & (self.merged_df['extras_type'] == 'none')
-        self.merged_df['is_six'] = self.merged_df['batsman_runs'] == 6
-        self.merged_df['is_four'] = self.merged_df['batsman_runs'] == 4
+        self.merged_df['is_boundary'] = is_boundary
+        self.merged_df['is_dot_ball'] = is_dot_ball
+        self.merged_df['is_six'] = is_six
+        self.merged_df['is_four'] = is_four
         
         print("✅ Datasets merged successfully!")
         print(f"📊 Merged data shape: {self.merged_df.shape}")
@@ -89,19 +111,24 @@ class DataProcessor:
         return self.merged_df
     
     def save_cleaned_data(self, output_path='data/processed/cleaned_data.csv'):
-        """Save cleaned data to CSV"""
+        """Save cleaned data to Parquet (primary) and CSV"""
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        self.merged_df.to_csv(output_path, index=False)
-        print(f"✅ Cleaned data saved to: {output_path}")
-        
-        # Also save some basic stats
+        parquet_path = os.path.splitext(output_path)[0] + '.parquet'
+        cleaned_df = self.merged_df[KEEP_COLS]
+        cleaned_df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+        cleaned_df.to_csv(output_path, index=False)
+        print(f"✅ Cleaned data saved to: {parquet_path} and {output_path}")
+        
+        # Also save some basic stats (teams are counted from the small per-column unique arrays)
+        team1_unique = self.merged_df['team1'].unique()
+        team2_unique = self.merged_df['team2'].unique()
         basic_stats = {
             'total_matches': self.merged_df['match_id'].nunique(),
             'total_balls': len(self.merged_df),
             'total_seasons': self.merged_df['year'].nunique(),
             'seasons_range': f"{self.merged_df['year'].min()}-{self.merged_df['year'].max()}",
             'unique_players': self.merged_df['batter'].nunique(),
-            'unique_teams': pd.concat([self.merged_df['team1'], self.merged_df['team2']]).nunique()
+            'unique_teams': len(np.union1d(team1_unique[pd.notna(team1_unique)], team2_unique[pd.notna(team2_unique)]))
         }
         
         print("\n📈 Dataset Summary:")
@@ -1,8 +1,16 @@
 import numpy as np
 import pandas as pd
+import os
+import matplotlib
+
+# Render off-screen unless interactive windows are requested (IPL_INTERACTIVE=1)
+INTERACTIVE = os.environ.get('IPL_INTERACTIVE', '').strip().lower() in ('1', 'true', 'yes', 'on')
+if not INTERACTIVE:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
+import pyarrow.csv as pacsv
 import seaborn as sns
-import os
 
 # Set style for better looking plots
 plt.style.use('default')
@@ -11,23 +19,49 @@ sns.set_palette("husl")
 class IPLVisualizer:
     def __init__(self):
         self.colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+        # One figure is reused for every chart instead of creating a new one each time
+        self.fig = plt.figure()
         self.load_data()
     
+    def _reset_figure(self, figsize):
+        """Clear and resize the shared figure, recreating it if its window was closed"""
+        if not plt.fignum_exists(self.fig.number):
+            self.fig = plt.figure()
+        self.fig.clear()
+        self.fig.set_size_inches(*figsize)
+        return self.fig
+    
+    def _show(self):
+        """Display the current chart when running interactively"""
+        if INTERACTIVE:
+            plt.show()
+    
+    def _read_processed(self, name):
+        """Read a processed table as an Arrow-backed DataFrame, preferring Parquet over CSV"""
+        parquet_path = f'data/processed/{name}.parquet'
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path, engine='pyarrow', dtype_backend='pyarrow')
+        return pacsv.read_csv(
+            f'data/processed/{name}.csv',
+            read_options=pacsv.ReadOptions(use_threads=True)
+        ).to_pandas(types_mapper=pd.ArrowDtype)
+    
     def load_data(self):
         """Load the analysis results"""
         try:
-            self.seasonal_trends = pd.read_csv('data/processed/seasonal_trends.csv')
-            self.batting_stats = pd.read_csv('data/processed/batting_stats.csv')
+            self.seasonal_trends = self._read_processed('seasonal_trends')
+            self.batting_stats = self._read_processed('batting_stats')
             print("✅ Visualization data loaded successfully!")
         except Exception as e:
             print(f"❌ Error loading data: {e}")
     
     def plot_strike_rate_evolution(self):
         """Plot the evolution of strike rate over years with trend line"""
-        plt.figure(figsize=(12, 6))
+        fig = self._reset_figure((12, 6))
+        ax = fig.add_subplot()
         
         # Main strike rate line
-        plt.plot(self.seasonal_trends['year'], self.seasonal_trends['strike_rate'], 
+        ax.plot(self.seasonal_trends['year'], self.seasonal_trends['strike_rate'], 
                 marker='o', linewidth=3, markersize=8, color=self.colors[0], label='Strike Rate')
         
         # Add trend line
@@ -40,29 +74,30 @@ class IPLVisualizer:
         trend_line = p(x)
 
         # Plot trend line
-        plt.plot(x, trend_line, "r--", alpha=0.8, linewidth=2, label=f'Trend Line (Slope: {z[0]:.2f})')
+        ax.plot(x, trend_line, "r--", alpha=0.8, linewidth=2, label=f'Trend Line (Slope: {z[0]:.2f})')
 
         # Add some statistics to the chart
         sr_increase = y.iloc[-1] - y.iloc[0]
         avg_growth = sr_increase / (len(x) - 1)
 
-        plt.title('Evolution of Batting Strike Rate in IPL (2007-2024)\n' + 
+        ax.set_title('Evolution of Batting Strike Rate in IPL (2007-2024)\n' + 
              f'Total Increase: +{sr_increase:.1f} points | Annual Growth: +{avg_growth:.1f} points/year', 
              fontsize=14, fontweight='bold', pad=20)
-        plt.xlabel('Year', fontsize=12)
-        plt.ylabel('Average Strike Rate', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('strike_rate_evolution.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        ax.set_xlabel('Year', fontsize=12)
+        ax.set_ylabel('Average Strike Rate', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        ax.tick_params(axis='x', rotation=45)
+        fig.tight_layout()
+        fig.savefig('strike_rate_evolution.png', dpi=300, bbox_inches='tight')
+        self._show()
 
         print("✅ Strike rate evolution chart with trend line saved!")
     
     def plot_boundary_evolution(self):
         """Plot boundary and dot ball evolution"""
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig = self._reset_figure((15, 6))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Boundary percentage
         ax1.plot(self.seasonal_trends['year'], self.seasonal_trends['boundary_percentage'], 
@@ -82,50 +117,52 @@ class IPLVisualizer:
         ax2.grid(True, alpha=0.3)
         ax2.tick_params(axis='x', rotation=45)
         
-        plt.tight_layout()
-        plt.savefig('boundary_evolution.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        fig.tight_layout()
+        fig.savefig('boundary_evolution.png', dpi=300, bbox_inches='tight')
+        self._show()
         
         print("✅ Boundary evolution charts saved!")
     
     def plot_six_vs_four_evolution(self):
         """Plot sixes vs fours evolution"""
-        plt.figure(figsize=(12, 6))
+        fig = self._reset_figure((12, 6))
+        ax = fig.add_subplot()
         
-        plt.plot(self.seasonal_trends['year'], self.seasonal_trends['six_percentage'], 
+        ax.plot(self.seasonal_trends['year'], self.seasonal_trends['six_percentage'], 
                 marker='o', linewidth=2, markersize=6, color='#ff7f0e', label='Six Percentage')
-        plt.plot(self.seasonal_trends['year'], self.seasonal_trends['four_percentage'], 
+        ax.plot(self.seasonal_trends['year'], self.seasonal_trends['four_percentage'], 
                 marker='s', linewidth=2, markersize=6, color='#1f77b4', label='Four Percentage')
         
-        plt.title('Evolution of Sixes vs Fours in IPL (2007-2024)', 
+        ax.set_title('Evolution of Sixes vs Fours in IPL (2007-2024)', 
                  fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Year', fontsize=12)
-        plt.ylabel('Percentage (%)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('six_vs_four_evolution.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        ax.set_xlabel('Year', fontsize=12)
+        ax.set_ylabel('Percentage (%)', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        ax.tick_params(axis='x', rotation=45)
+        fig.tight_layout()
+        fig.savefig('six_vs_four_evolution.png', dpi=300, bbox_inches='tight')
+        self._show()
         
         print("✅ Six vs Four evolution chart saved!")
     
     def plot_run_rate_evolution(self):
         """Plot run rate evolution"""
-        plt.figure(figsize=(12, 6))
+        fig = self._reset_figure((12, 6))
+        ax = fig.add_subplot()
         
-        plt.plot(self.seasonal_trends['year'], self.seasonal_trends['run_rate'], 
+        ax.plot(self.seasonal_trends['year'], self.seasonal_trends['run_rate'], 
                 marker='D', linewidth=2, markersize=6, color=self.colors[3])
         
-        plt.title('Evolution of Run Rate in IPL (2007-2024)', 
+        ax.set_title('Evolution of Run Rate in IPL (2007-2024)', 
                  fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Year', fontsize=12)
-        plt.ylabel('Run Rate (Runs per Over)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('run_rate_evolution.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        ax.set_xlabel('Year', fontsize=12)
+        ax.set_ylabel('Run Rate (Runs per Over)', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(axis='x', rotation=45)
+        fig.tight_layout()
+        fig.savefig('run_rate_evolution.png', dpi=300, bbox_inches='tight')
+        self._show()
         
         print("✅ Run rate evolution chart saved!")
     
@@ -135,29 +172,31 @@ class IPLVisualizer:
         top_players = self.batting_stats[self.batting_stats['balls_faced'] >= 100]\
             .nlargest(10, 'strike_rate')
         
-        plt.figure(figsize=(12, 8))
-        bars = plt.barh(top_players['batter'], top_players['strike_rate'], 
+        fig = self._reset_figure((12, 8))
+        ax = fig.add_subplot()
+        bars = ax.barh(top_players['batter'], top_players['strike_rate'], 
                        color=self.colors[4], alpha=0.7)
         
         # Add value labels
         for bar in bars:
             width = bar.get_width()
-            plt.text(width + 1, bar.get_y() + bar.get_height()/2, 
+            ax.text(width + 1, bar.get_y() + bar.get_height()/2, 
                     f'{width:.1f}', ha='left', va='center', fontweight='bold')
         
-        plt.title('Top 10 Batsmen by Strike Rate (Min 100 Balls)', 
+        ax.set_title('Top 10 Batsmen by Strike Rate (Min 100 Balls)', 
                  fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Strike Rate')
-        plt.grid(True, alpha=0.3, axis='x')
-        plt.tight_layout()
-        plt.savefig('top_performers.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        ax.set_xlabel('Strike Rate')
+        ax.grid(True, alpha=0.3, axis='x')
+        fig.tight_layout()
+        fig.savefig('top_performers.png', dpi=300, bbox_inches='tight')
+        self._show()
         
         print("✅ Top performers chart saved!")
     
     def create_comprehensive_dashboard(self):
         """Create a comprehensive dashboard with all charts"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = self._reset_figure((16, 12))
+        axes = fig.subplots(2, 2)
         
         # Strike Rate Evolution
         axes[0,0].plot(self.seasonal_trends['year'], self.seasonal_trends['strike_rate'], 
@@ -196,11 +235,11 @@ class IPLVisualizer:
         axes[1,1].grid(True, alpha=0.3)
         axes[1,1].tick_params(axis='x', rotation=45)
         
-        plt.suptitle('IPL Batting Evolution Analysis Dashboard (2007-2024)', 
+        fig.suptitle('IPL Batting Evolution Analysis Dashboard (2007-2024)', 
                     fontsize=18, fontweight='bold', y=0.95)
-        plt.tight_layout()
-        plt.savefig('comprehensive_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        fig.tight_layout()
+        fig.savefig('comprehensive_dashboard.png', dpi=300, bbox_inches='tight')
+        self._show()
         
         print("✅ Comprehensive dashboard saved!")
 